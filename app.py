@@ -1,43 +1,9 @@
 import streamlit as st
 import requests
-import pandas as pd
 import folium
 from streamlit_folium import st_folium
-from datetime import datetime
-
-# Open-Meteo API URL
-# 404 오류가 발생하는 Open-Meteo reverse geocoding 대신 Nominatim API를 사용
-REVERSE_GEOCODING_URL = "https://nominatim.openstreetmap.org/reverse"
-WEATHER_URL = "https://api.open-meteo.com/v1/forecast"
-
-def get_weather_info(code):
-    """
-    Open-Meteo 날씨 코드를 설명과 이모지로 변환합니다.
-    """
-    weather_codes = {
-        0: ("맑음", "☀️"),
-        1: ("대체로 맑음", "🌤️"),
-        2: ("부분적으로 흐림", "⛅"),
-        3: ("흐림", "☁️"),
-        45: ("안개", "🌫️"),
-        48: ("서리 안개", "🌫️"),
-        51: ("가벼운 이슬비", "🌦️"),
-        53: ("보통 이슬비", "🌦️"),
-        55: ("강한 이슬비", "🌦️"),
-        61: ("가벼운 비", "🌧️"),
-        63: ("보통 비", "🌧️"),
-        65: ("강한 비", "🌧️"),
-        71: ("가벼운 눈", "🌨️"),
-        73: ("보통 눈", "🌨️"),
-        75: ("강한 눈", "🌨️"),
-        80: ("가벼운 소나기", "🌧️"),
-        81: ("보통 소나기", "🌧️"),
-        82: ("강한 소나기", "🌧️"),
-        95: ("뇌우", "⛈️"),
-        96: ("가벼운 우박 뇌우", "⛈️"),
-        99: ("강한 우박 뇌우", "⛈️"),
-    }
-    return weather_codes.get(code, ("알 수 없음", "❓"))
+
+from weather_common import COORD_DECIMALS, location_view
 
 # --- Streamlit 앱 UI ---
 st.set_page_config(page_title="클릭! 날씨 확인 앱", page_icon="🗺️")
@@ -52,11 +18,25 @@ if 'zoom' not in st.session_state:
 if 'clicked_location' not in st.session_state:
     st.session_state.clicked_location = None
 
-# 2. Folium 지도 생성
+# 2. 지도 클릭 이벤트 처리
+# st_folium이 key로 저장한 직전 반환값에서 클릭 위치를 읽어, 지도를 그리기 전에 세션 상태를 갱신
+# (지도를 한 번만 렌더링하면 되므로 마커 반영을 위한 st.rerun()이 필요 없음)
+map_state = st.session_state.get("folium_map")
+if map_state and map_state.get("last_clicked"):
+    lat = map_state["last_clicked"]["lat"]
+    lon = map_state["last_clicked"]["lng"]
+
+    # 클릭한 위치가 이전과 다를 경우에만 중심 이동 및 줌
+    if st.session_state.clicked_location != [lat, lon]:
+        st.session_state.center = [lat, lon]
+        st.session_state.zoom = 10
+        st.session_state.clicked_location = [lat, lon]
+
+# 3. Folium 지도 생성
 st.subheader("1. 지역 선택 (지도를 클릭하세요)")
 m = folium.Map(location=st.session_state.center, zoom_start=st.session_state.zoom)
 
-# 만약 이전에 클릭한 위치가 있다면 마커 추가
+# 만약 클릭한 위치가 있다면 마커 추가
 if st.session_state.clicked_location:
     folium.Marker(
         st.session_state.clicked_location,
@@ -64,93 +44,30 @@ if st.session_state.clicked_location:
         tooltip="선택한 위치"
     ).add_to(m)
 
-# 3. Streamlit-Folium으로 지도 렌더링 및 클릭 데이터 받기
+# 4. Streamlit-Folium으로 지도 렌더링
 # returned_objects=[] 파라미터를 제거하여 last_clicked가 기본으로 반환되도록 수정
-map_data = st_folium(m, width="100%", height=500, key="folium_map")
-
-# 4. 지도 클릭 이벤트 처리
-# map_data가 None이 아니고, "last_clicked" 키가 있는지 확인
-if map_data and map_data.get("last_clicked"):
-    lat = map_data["last_clicked"]["lat"]
-    lon = map_data["last_clicked"]["lng"]
-    
-    # 세션 상태 업데이트 (클릭한 위치로 중심 이동 및 줌)
-    # 클릭한 위치가 이전과 다를 경우에만 rerun
-    if st.session_state.clicked_location != [lat, lon]:
-        st.session_state.center = [lat, lon]
-        st.session_state.zoom = 10
-        st.session_state.clicked_location = [lat, lon]
-        
-        # 페이지를 새로고침하여 지도에 마커를 즉시 반영
-        st.rerun()
+st_folium(m, width="100%", height=500, key="folium_map")
 
 # 5. 날씨 정보 표시 (클릭된 위치가 있을 경우)
 if st.session_state.clicked_location:
     lat, lon = st.session_state.clicked_location
+    # 약 1km 단위(소수점 둘째 자리)로 반올림하여 가까운 위치의 클릭은 캐시된 결과를 재사용
+    lat, lon = round(lat, COORD_DECIMALS), round(lon, COORD_DECIMALS)
 
     with st.spinner("날씨 정보를 가져오는 중..."):
         try:
-            # 5-1. 위도/경도 -> 지역 이름 변환 (Reverse Geocoding)
-            # Nominatim API에 맞게 파라미터 이름 변경 (latitude -> lat, longitude -> lon)
-            geo_params = {"lat": lat, "lon": lon, "format": "json"}
-            
-            # Nominatim은 User-Agent 헤더가 필요합니다.
-            headers = {"User-Agent": "Streamlit-Weather-App-Test"}
-            
-            # 여기서 requests.get이 REVERSE_GEOCODING_URL을 사용합니다.
-            geo_response = requests.get(REVERSE_GEOCODING_URL, params=geo_params, headers=headers)
-            geo_response.raise_for_status() # 404가 발생한 지점
-            geo_data = geo_response.json()
-            
-            # API 응답에서 지역 이름 추출
-            location_name = geo_data.get('display_name', f"위도: {lat:.2f}, 경도: {lon:.2f}")
-            if 'address' in geo_data and geo_data['address']:
-                # 주소에서 구, 시, 도 순서로 이름 찾기
-                addr = geo_data['address']
-                location_name = addr.get('city_district', 
-                                  addr.get('city', 
-                                    addr.get('state', 
-                                      addr.get('country', location_name))))
-
-            st.subheader(f"📍 {location_name}의 날씨")
-
-            # 5-2. 위도/경도 -> 날씨 정보 조회
-            weather_params = {
-                "latitude": lat,
-                "longitude": lon,
-                "current_weather": "true",
-                "daily": "weathercode,temperature_2m_max,temperature_2m_min",
-                "timezone": "auto" # 시간대 자동 설정
-            }
-            weather_response = requests.get(WEATHER_URL, params=weather_params)
-            weather_response.raise_for_status()
-            weather_data = weather_response.json()
-
-            # 5-3. 현재 날씨 표시
-            st.header("현재 날씨")
-            current = weather_data["current_weather"]
-            current_temp = current["temperature"]
-            current_code = current["weathercode"]
-            current_desc, current_icon = get_weather_info(current_code)
+            # 5-1. 좌표 -> 지역 이름, 현재 날씨, 주간 예보 (결과 전체가 좌표 단위로 캐시됨)
+            view = location_view(lat, lon)
+
+            st.subheader(f"📍 {view['location_name']}의 날씨")
 
-            st.metric(label=f"{current_desc} {current_icon}", value=f"{current_temp}°C")
+            # 5-2. 현재 날씨 표시
+            st.header("현재 날씨")
+            st.metric(label=f"{view['current_desc']} {view['current_icon']}", value=f"{view['current_temp']}°C")
 
-            # 5-4. 주간 예보 표시
+            # 5-3. 주간 예보 표시
             st.header("주간 예보")
-            daily_data = weather_data["daily"]
-            forecast_cols = st.columns(7)
-            
-            for i in range(7):
-                with forecast_cols[i]:
-                    day_str = pd.to_datetime(daily_data['time'][i]).strftime('%a')
-                    code = daily_data['weathercode'][i]
-                    _, icon = get_weather_info(code)
-                    max_temp = daily_data['temperature_2m_max'][i]
-                    min_temp = daily_data['temperature_2m_min'][i]
-
-                    st.write(day_str)
-                    st.markdown(f"<div style='font-size: 2rem; text-align: center;'>{icon}</div>", unsafe_allow_html=True)
-                    st.write(f"{max_temp:.0f}° / {min_temp:.0f}°")
+            st.markdown(view['forecast_html'], unsafe_allow_html=True)
 
         except requests.exceptions.RequestException as e:
             # 404 오류가 여기에 해당됩니다.
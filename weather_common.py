@@ -0,0 +1,183 @@
+"""
+날씨 앱에서 공통으로 사용하는 API 호출, 날씨 코드 변환 및 화면 데이터 생성 함수 모음입니다.
+"""
+import streamlit as st
+import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# Open-Meteo API URL
+# 404 오류가 발생하는 Open-Meteo reverse geocoding 대신 Nominatim API를 사용
+REVERSE_GEOCODING_URL = "https://nominatim.openstreetmap.org/reverse"
+WEATHER_URL = "https://api.open-meteo.com/v1/forecast"
+
+# API 요청 제한 시간 (연결, 읽기) 초
+REQUEST_TIMEOUT = (2, 5)
+
+# 캐시 키로 사용할 좌표의 소수점 자릿수 (0.01° ≈ 1km)
+COORD_DECIMALS = 2
+
+# Open-Meteo 날씨 코드 -> (설명, 이모지)
+WEATHER_CODES = MappingProxyType({
+    0: ("맑음", "☀️"),
+    1: ("대체로 맑음", "🌤️"),
+    2: ("부분적으로 흐림", "⛅"),
+    3: ("흐림", "☁️"),
+    45: ("안개", "🌫️"),
+    48: ("서리 안개", "🌫️"),
+    51: ("가벼운 이슬비", "🌦️"),
+    53: ("보통 이슬비", "🌦️"),
+    55: ("강한 이슬비", "🌦️"),
+    61: ("가벼운 비", "🌧️"),
+    63: ("보통 비", "🌧️"),
+    65: ("강한 비", "🌧️"),
+    71: ("가벼운 눈", "🌨️"),
+    73: ("보통 눈", "🌨️"),
+    75: ("강한 눈", "🌨️"),
+    80: ("가벼운 소나기", "🌧️"),
+    81: ("보통 소나기", "🌧️"),
+    82: ("강한 소나기", "🌧️"),
+    95: ("뇌우", "⛈️"),
+    96: ("가벼운 우박 뇌우", "⛈️"),
+    99: ("강한 우박 뇌우", "⛈️"),
+})
+
+def get_weather_info(code):
+    """
+    Open-Meteo 날씨 코드를 설명과 이모지로 변환합니다.
+    """
+    return WEATHER_CODES.get(code, ("알 수 없음", "❓"))
+
+@st.cache_resource
+def http():
+    """
+    연결을 재사용하는 requests 세션을 반환합니다.
+    재실행마다 TCP/TLS 연결을 새로 맺지 않도록 모든 세션에서 공유합니다.
+    """
+    session = requests.Session()
+    session.headers["Accept-Encoding"] = "gzip"
+    # 일시적인 게이트웨이 오류는 짧은 백오프로 재시도
+    retry = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["GET"]
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+def _decode_json(response):
+    """
+    orjson으로 응답 본문을 JSON으로 변환합니다.
+    JSON이 아닌 응답은 response.json()과 같이 requests의 JSONDecodeError로 알립니다.
+    """
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def reverse_geocode(lat, lon):
+    """
+    위도/경도를 Nominatim API로 조회하여 주소 정보를 반환합니다.
+    같은 좌표에 대한 결과는 캐시되어 재실행 시 다시 요청하지 않습니다.
+    """
+    # Nominatim API에 맞게 파라미터 이름 변경 (latitude -> lat, longitude -> lon)
+    geo_params = {"lat": lat, "lon": lon, "format": "json"}
+
+    # Nominatim은 User-Agent 헤더가 필요합니다.
+    headers = {"User-Agent": "Streamlit-Weather-App-Test"}
+
+    geo_response = http().get(REVERSE_GEOCODING_URL, params=geo_params, headers=headers, timeout=REQUEST_TIMEOUT)
+    geo_response.raise_for_status()
+    return _decode_json(geo_response)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_weather(lat, lon):
+    """
+    위도/경도의 현재 날씨와 주간 예보를 Open-Meteo API로 조회합니다.
+    location_view와 같은 유효 시간을 사용하여 날씨 정보가 10분보다 오래되지 않도록 합니다.
+    """
+    weather_params = {
+        "latitude": lat,
+        "longitude": lon,
+        "current_weather": "true",
+        "daily": "weathercode,temperature_2m_max,temperature_2m_min",
+        "timezone": "auto", # 시간대 자동 설정
+        "timeformat": "unixtime", # ISO8601 문자열 대신 정수 타임스탬프로 응답
+        "forecast_days": 7
+    }
+    weather_response = http().get(WEATHER_URL, params=weather_params, timeout=REQUEST_TIMEOUT)
+    weather_response.raise_for_status()
+    return _decode_json(weather_response)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def location_view(lat, lon):
+    """
+    좌표 하나에 대해 화면에 필요한 모든 값을 한 번에 만들어 반환합니다.
+    같은 좌표로 재실행되면 API 호출과 HTML 생성 없이 캐시된 결과를 사용합니다.
+    """
+    # 지역 이름 변환(Reverse Geocoding)과 날씨 조회는 좌표에만 의존하므로 동시에 요청
+    # (호출마다 전용 풀을 사용하여 다른 사용자의 요청이 공유 풀에서 대기하지 않도록 함)
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        geo_future = executor.submit(reverse_geocode, lat, lon)
+        weather_future = executor.submit(fetch_weather, lat, lon)
+        geo_data = geo_future.result()
+        weather_data = weather_future.result()
+    finally:
+        # 한쪽 요청이 실패하면 다른 요청의 완료를 기다리지 않고 바로 오류를 알림
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # API 응답에서 지역 이름 추출
+    location_name = geo_data.get('display_name', f"위도: {lat:.2f}, 경도: {lon:.2f}")
+    if 'address' in geo_data and geo_data['address']:
+        # 주소에서 구, 시, 도 순서로 이름 찾기
+        addr = geo_data['address']
+        location_name = addr.get('city_district',
+                          addr.get('city',
+                            addr.get('state',
+                              addr.get('country', location_name))))
+
+    # 현재 날씨
+    current = weather_data["current_weather"]
+    current_desc, current_icon = get_weather_info(current["weathercode"])
+
+    # 주간 예보
+    daily_data = weather_data["daily"]
+    # unixtime은 UTC 기준이므로 현지 시간대 오프셋을 더해 요일을 계산
+    utc_offset = weather_data.get("utc_offset_seconds", 0)
+    days = [
+        datetime.fromtimestamp(t + utc_offset, tz=timezone.utc).strftime('%a')
+        for t in daily_data['time'][:7]
+    ]
+    codes = daily_data['weathercode'][:7]
+    maxs = daily_data['temperature_2m_max'][:7]
+    mins = daily_data['temperature_2m_min'][:7]
+    icons = [get_weather_info(code)[1] for code in codes]
+    temps = ["%.0f° / %.0f°" % t for t in zip(maxs, mins)]
+
+    # 7일치 예보를 하나의 flexbox HTML로 만들어 st.markdown 한 번으로 출력할 수 있게 함
+    forecast_html = (
+        "<div style='display: flex; justify-content: space-between;'>"
+        + "".join(
+            f"<div style='flex: 1; text-align: center;'>{days[i]}"
+            f"<div style='font-size: 2rem;'>{icons[i]}</div>"
+            f"{temps[i]}</div>"
+            for i in range(len(days))
+        )
+        + "</div>"
+    )
+
+    return {
+        "location_name": location_name,
+        "current_temp": current["temperature"],
+        "current_desc": current_desc,
+        "current_icon": current_icon,
+        "forecast_html": forecast_html,
+    }